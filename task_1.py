@@ -1,6 +1,11 @@
-from collections import deque
+import argparse
+import numbers
 import networkx as nx
-import matplotlib.pyplot as plt
+import numpy as np
+from numba import njit
+from scipy.sparse import csr_matrix
+
+INT32_MAX = np.iinfo(np.int32).max
 
 
 def create_logistics_graph():
@@ -37,8 +42,9 @@ def add_super_source_sink(
     """
     Adds a super source node and a super sink node to the given graph.
 
-    The super source node is connected to all terminals with infinite capacity edges,
-    while the super sink node is connected to all stores with infinite capacity edges.
+    The super source node is connected to all terminals and all stores are connected
+    to the super sink node with edges of "unbounded" capacity. The capacity is the sum
+    of all existing edge capacities, which no flow can exceed, so it stays a finite int.
 
     Args:
         G (nx.DiGraph): The graph to add the super source and super sink nodes to.
@@ -47,103 +53,241 @@ def add_super_source_sink(
         super_source (str): The name of the super source node.
         super_sink (str): The name of the super sink node.
     """
-    for terminal in terminals:
-        G.add_edge(super_source, terminal, weight=float("inf"))
-    for store in stores:
-        G.add_edge(store, super_sink, weight=float("inf"))
+    # Invalid weights are skipped here and reported by build_capacity_matrix.
+    unbounded = sum(
+        weight
+        for _, _, weight in G.edges.data("weight")
+        if isinstance(weight, numbers.Integral) and weight > 0
+    )
+    G.add_edges_from(
+        ((super_source, terminal) for terminal in terminals), weight=unbounded
+    )
+    G.add_edges_from(((store, super_sink) for store in stores), weight=unbounded)
 
 
-def build_capacity_matrix(G, node_indices):
+def build_capacity_matrix(G):
     """
-    Builds a capacity matrix from the given graph and node indices.
+    Builds a CSR (compressed sparse row) residual network from the given graph.
+
+    Every edge of the graph gets a zero-capacity reverse ("sister") edge; the
+    matrix is assembled with scipy.sparse, which merges a sister edge with an
+    existing antiparallel edge. The out-edges of node u occupy positions
+    indptr[u]..indptr[u + 1] - 1.
 
     Args:
-        G (nx.DiGraph): The graph to build the capacity matrix from.
-        node_indices (Dict[str, int]): A dictionary mapping node names to their indices in the matrix.
+        G (nx.DiGraph): The graph to build the residual network from, with nodes
+            labelled 0..n-1 (see nx.convert_node_labels_to_integers).
 
     Returns:
-        List[List[int]]: A 2D list representing the capacity matrix, where matrix[i][j] is the capacity of the edge from node i to node j.
+        Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: The int32 arrays
+        indptr, indices, capacity and rev, where indices[k] is the head of edge k,
+        capacity[k] is its capacity and rev[k] is the position of its reverse edge.
 
     Raises:
-        ValueError: If the graph contains edges with negative or zero capacity.
+        ValueError: If an edge has a missing, non-integer, non-positive weight
+            or a weight that does not fit into int32.
+    """
+    n = G.number_of_nodes()
+    for u, v, weight in G.edges.data("weight"):
+        if not isinstance(weight, numbers.Integral) or not 0 < weight <= INT32_MAX:
+            u_name = G.nodes[u].get("name", u)
+            v_name = G.nodes[v].get("name", v)
+            raise ValueError(
+                f"Edge {u_name} -> {v_name} must have a positive int32 weight, "
+                f"got {weight!r}"
+            )
+    edges = np.array(list(G.edges.data("weight")), dtype=np.int32).reshape(-1, 3)
+    rows, cols, weights = edges.T
+    residual = csr_matrix(
+        (
+            np.concatenate([weights, np.zeros_like(weights)]),
+            (np.concatenate([rows, cols]), np.concatenate([cols, rows])),
+        ),
+        shape=(n, n),
+        dtype=np.int32,
+    )
+    residual.sum_duplicates()
+
+    indptr = residual.indptr.astype(np.int32)
+    indices = residual.indices.astype(np.int32)
+    tails = np.repeat(np.arange(n, dtype=np.int32), np.diff(indptr))
+    # The edge set is symmetric, so sorting edges by (head, tail) lists
+    # the reverse of every edge in CSR order.
+    rev = np.lexsort((tails, indices)).astype(np.int32)
+    return indptr, indices, residual.data, rev
+
+
+@njit(cache=True)
+def bfs(indptr, indices, capacity, flow, source, sink, level, queue):
+    """
+    Builds the level graph of the residual network.
+
+    Sets level[v] to the BFS distance from the source over edges with
+    positive residual capacity, or -1 for unreachable nodes. The search stops
+    as soon as the sink is labelled: every node closer to the source already
+    has its level, and nodes that are not closer than the sink cannot lie on
+    a shortest augmenting path. queue is caller-owned scratch space of n slots.
+
+    Returns:
+        bool: True if the sink is reachable from the source.
     """
-    n = len(node_indices)
-    matrix = [[0] * n for _ in range(n)]
-    for u, v, data in G.edges(data=True):
-        i, j = node_indices[u], node_indices[v]
-        matrix[i][j] = data["weight"]
-    return matrix
-
-
-def bfs(capacity, flow, source, sink, parent):
-    visited = [False] * len(capacity)
-    queue = deque([source])
-    visited[source] = True
-
-    while queue:
-        u = queue.popleft()
-        for v in range(len(capacity)):
-            if not visited[v] and capacity[u][v] - flow[u][v] > 0:
-                parent[v] = u
-                visited[v] = True
+    level[:] = -1
+    head, tail = 0, 1
+    queue[0] = source
+    level[source] = 0
+
+    while head < tail:
+        u = queue[head]
+        head += 1
+        next_level = level[u] + 1
+        for k in range(indptr[u], indptr[u + 1]):
+            v = indices[k]
+            if level[v] < 0 and capacity[k] > flow[k]:
+                level[v] = next_level
                 if v == sink:
                     return True
-                queue.append(v)
+                queue[tail] = v
+                tail += 1
     return False
 
 
-def edmonds_karp(capacity, source, sink):
-    n = len(capacity)
-    flow = [[0] * n for _ in range(n)]
-    parent = [-1] * n
+@njit(cache=True)
+def dfs(indptr, indices, capacity, flow, rev, level, iter_ptr, path, source, sink):
+    """
+    Pushes a blocking flow through the level graph, one augmenting path at a time.
+
+    iter_ptr[u] is the current edge of node u; edges that cannot lead to the
+    sink are skipped for the rest of the phase, so each edge is examined
+    O(1) times per phase (amortized).
+
+    Returns:
+        int: The total amount of flow pushed.
+    """
+    total_flow = 0
+    depth = 0
+    u = source
+    while True:
+        if u == sink:
+            path_flow = INT32_MAX
+            for i in range(depth):
+                k = path[i]
+                path_flow = min(path_flow, capacity[k] - flow[k])
+            for i in range(depth):
+                k = path[i]
+                flow[k] += path_flow
+                flow[rev[k]] -= path_flow
+            total_flow += path_flow
+            depth = 0
+            u = source
+            continue
+
+        next_level = level[u] + 1
+        end = indptr[u + 1]
+        k = iter_ptr[u]
+        while k < end:
+            if level[indices[k]] == next_level and capacity[k] > flow[k]:
+                break
+            k += 1
+        iter_ptr[u] = k
+        if k < end:
+            path[depth] = k
+            depth += 1
+            u = indices[k]
+            continue
+
+        if depth == 0:
+            return total_flow
+        # Dead end: retreat and skip the edge that led here.
+        depth -= 1
+        u = indices[rev[path[depth]]]
+        iter_ptr[u] += 1
+
+
+@njit(cache=True)
+def dinic(indptr, indices, capacity, rev, source, sink):
+    """
+    Computes the maximum flow from source to sink with Dinic's algorithm.
+
+    Args:
+        indptr, indices, capacity, rev (np.ndarray): The CSR residual network
+            returned by build_capacity_matrix.
+        source (int): The index of the source node.
+        sink (int): The index of the sink node.
+
+    Returns:
+        Tuple[int, np.ndarray]: The maximum flow value and the flow on every
+        CSR edge (flow[k] is the flow on edge k, not an n x n matrix; use
+        flow_matrix to get one).
+    """
+    n = len(indptr) - 1
+    flow = np.zeros_like(capacity)
+    # Work buffers are allocated once and reset in place every phase.
+    level = np.empty(n, dtype=np.int32)
+    queue = np.empty(n, dtype=np.int32)
+    iter_ptr = np.empty(n, dtype=np.int32)
+    path = np.empty(n, dtype=np.int32)
     max_flow = 0
 
-    while bfs(capacity, flow, source, sink, parent):
-        path_flow = float("inf")
-        s = sink
-        while s != source:
-            path_flow = min(path_flow, capacity[parent[s]][s] - flow[parent[s]][s])
-            s = parent[s]
-        v = sink
-        while v != source:
-            u = parent[v]
-            flow[u][v] += path_flow
-            flow[v][u] -= path_flow
-            v = parent[v]
-        max_flow += path_flow
+    while bfs(indptr, indices, capacity, flow, source, sink, level, queue):
+        iter_ptr[:] = indptr[:-1]
+        max_flow += dfs(
+            indptr, indices, capacity, flow, rev, level, iter_ptr, path, source, sink
+        )
 
     return max_flow, flow
 
 
+def flow_matrix(indptr, indices, flow):
+    """
+    Converts per-edge flows of a CSR residual network into a dense matrix.
+
+    Returns:
+        np.ndarray: An n x n matrix where matrix[i][j] is the net flow from node i to node j.
+    """
+    n = len(indptr) - 1
+    return csr_matrix((flow, indices, indptr), shape=(n, n)).toarray()
+
+
+def index_array(node_indices, nodes):
+    """
+    Looks up the matrix indices of the given nodes once, as a NumPy index array.
+    """
+    return np.fromiter(
+        (node_indices[node] for node in nodes), dtype=np.intp, count=len(nodes)
+    )
+
+
 def print_flow_table(flow, node_indices, terminals, warehouses, store_range):
+    flow = np.asarray(flow)
+    stores = [f"Магазин {store_num}" for store_num in store_range]
+    term_idx = index_array(node_indices, terminals)
+    warehouse_idx = index_array(node_indices, warehouses)
+    store_idx = index_array(node_indices, stores)
+
+    term_warehouse = flow[term_idx[:, None], warehouse_idx]
+    warehouse_store = flow[warehouse_idx[:, None], store_idx]
+    # totals[t, s] = sum over warehouses w of min(flow[t, w], flow[w, s]),
+    # counting only routes where both legs carry flow.
+    totals = (
+        np.minimum(term_warehouse[:, :, None], warehouse_store[None, :, :])
+        .clip(min=0)
+        .sum(axis=1)
+    )
+
     print("Таблиця фактичних потоків (термінал - магазин):")
-    for term in terminals:
-        term_idx = node_indices[term]
-        for store_num in store_range:
-            store = f"Магазин {store_num}"
-            store_idx = node_indices[store]
-            total_flow = 0
-            for warehouse in warehouses:
-                warehouse_idx = node_indices[warehouse]
-                if (
-                    flow[warehouse_idx][store_idx] > 0
-                    and flow[term_idx][warehouse_idx] > 0
-                ):
-                    total_flow += min(
-                        flow[warehouse_idx][store_idx], flow[term_idx][warehouse_idx]
-                    )
-            if total_flow > 0:
-                print(f"{term} - {store}: {total_flow} од.")
+    for t, s in zip(*np.nonzero(totals)):
+        print(f"{terminals[t]} - {stores[s]}: {totals[t, s]} од.")
 
 
 def draw_graph(G, pos):
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(15, 10))
-    visible_nodes = [node for node in G.nodes if node in pos]
-    visible_edges = [(u, v) for u, v in G.edges if u in pos and v in pos]
-    visible_labels = {(u, v): G[u][v]["weight"] for u, v in visible_edges}
+    visible_graph = G.subgraph([node for node in G.nodes if node in pos])
+    visible_labels = nx.get_edge_attributes(visible_graph, "weight")
 
     nx.draw(
-        G.subgraph(visible_nodes),
+        visible_graph,
         pos,
         with_labels=True,
         node_size=2000,
@@ -156,51 +300,65 @@ def draw_graph(G, pos):
     plt.show()
 
 
-
-G = create_logistics_graph()
-
-positions = {
-    "Термінал 1": (-1, 0),
-    "Термінал 2": (3, 0),
-    "Склад 1": (0, 1.5),
-    "Склад 2": (2, 1.5),
-    "Склад 3": (0, -1.5),
-    "Склад 4": (2, -1.5),
-    "Магазин 1": (-2, 3),
-    "Магазин 2": (-1, 3),
-    "Магазин 3": (0, 3),
-    "Магазин 4": (1, 3),
-    "Магазин 5": (2, 3),
-    "Магазин 6": (3, 3),
-    "Магазин 7": (-2, -3),
-    "Магазин 8": (-1, -3),
-    "Магазин 9": (0, -3),
-    "Магазин 10": (1, -3),
-    "Магазин 11": (2, -3),
-    "Магазин 12": (3, -3),
-    "Магазин 13": (4, -3),
-    "Магазин 14": (5, -3),
-}
-
-super_source = "Джерело"
-super_sink = "Сток"
-
-terminals = ["Термінал 1", "Термінал 2"]
-warehouses = ["Склад 1", "Склад 2", "Склад 3", "Склад 4"]
-stores = [f"Магазин {i}" for i in range(1, 15)]
-
-add_super_source_sink(G, terminals, stores, super_source, super_sink)
-
-nodes = list(G.nodes)
-node_indices = {node: i for i, node in enumerate(nodes)}
-capacity_matrix = build_capacity_matrix(G, node_indices)
-
-source_idx = node_indices[super_source]
-sink_idx = node_indices[super_sink]
-
-max_flow, flow = edmonds_karp(capacity_matrix, source_idx, sink_idx)
-
-print(f"Максимальний потік у логістичній мережі: {max_flow}")
-print_flow_table(flow, node_indices, terminals, warehouses, range(1, 15))
-
-draw_graph(G, positions)
+def main():
+    parser = argparse.ArgumentParser(
+        description="Максимальний потік у логістичній мережі"
+    )
+    parser.add_argument(
+        "--draw", action="store_true", help="показати граф логістичної мережі"
+    )
+    args = parser.parse_args()
+
+    G = create_logistics_graph()
+
+    positions = {
+        "Термінал 1": (-1, 0),
+        "Термінал 2": (3, 0),
+        "Склад 1": (0, 1.5),
+        "Склад 2": (2, 1.5),
+        "Склад 3": (0, -1.5),
+        "Склад 4": (2, -1.5),
+        "Магазин 1": (-2, 3),
+        "Магазин 2": (-1, 3),
+        "Магазин 3": (0, 3),
+        "Магазин 4": (1, 3),
+        "Магазин 5": (2, 3),
+        "Магазин 6": (3, 3),
+        "Магазин 7": (-2, -3),
+        "Магазин 8": (-1, -3),
+        "Магазин 9": (0, -3),
+        "Магазин 10": (1, -3),
+        "Магазин 11": (2, -3),
+        "Магазин 12": (3, -3),
+        "Магазин 13": (4, -3),
+        "Магазин 14": (5, -3),
+    }
+
+    super_source = "Джерело"
+    super_sink = "Сток"
+
+    terminals = ["Термінал 1", "Термінал 2"]
+    warehouses = ["Склад 1", "Склад 2", "Склад 3", "Склад 4"]
+    stores = [f"Магазин {i}" for i in range(1, 15)]
+
+    add_super_source_sink(G, terminals, stores, super_source, super_sink)
+
+    G_int = nx.convert_node_labels_to_integers(G, label_attribute="name")
+    node_indices = {name: i for i, name in G_int.nodes(data="name")}
+    indptr, indices, capacity, rev = build_capacity_matrix(G_int)
+
+    source_idx = node_indices[super_source]
+    sink_idx = node_indices[super_sink]
+
+    max_flow, edge_flow = dinic(indptr, indices, capacity, rev, source_idx, sink_idx)
+    flow = flow_matrix(indptr, indices, edge_flow)
+
+    print(f"Максимальний потік у логістичній мережі: {max_flow}")
+    print_flow_table(flow, node_indices, terminals, warehouses, range(1, 15))
+
+    if args.draw:
+        draw_graph(G, positions)
+
+
+if __name__ == "__main__":
+    main()
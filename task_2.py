@@ -1,117 +1,130 @@
 import csv
 from timeit import timeit
 from typing import Dict, List, Tuple
+import numpy as np
 from BTrees.OOBTree import OOBTree
 
 
 CSV_FILE = "./generated_items_data.csv"
 
+Item = Tuple[int, str, str, float]
 
-def load_items_from_csv(file_path: str) -> List[Tuple[int, Dict]]:
+
+def load_items_from_csv(file_path: str) -> Dict[str, np.ndarray]:
     """
-    Loads items from a CSV file and returns them as a list of tuples.
+    Loads items from a CSV file and returns them as a column store.
 
-    Each tuple contains an integer item ID and a dictionary with item details
-    such as name, category, and price.
+    Item details are kept as parallel arrays (one per CSV column) instead of
+    one dictionary per item, so row i of every array describes the same item.
+    Rows are sorted by price, which lets range queries use binary search.
+    The "Item" column holds each row as a ready-made (ID, Name, Category, Price)
+    tuple, so queries can return rows without reassembling them.
 
     Args:
         file_path (str): The path to the CSV file containing item data.
 
     Returns:
-        List[Tuple[int, Dict]]: A list of tuples where each tuple consists of
-        an item ID and a dictionary with the item's details.
+        Dict[str, np.ndarray]: A dictionary with the keys "ID", "Name",
+        "Category", "Price" and "Item" mapping to int64, object, object,
+        float64 and object arrays respectively, ordered by ascending price.
     """
 
-    items = []
+    ids, names, categories, prices = [], [], [], []
     with open(file_path, newline="", encoding="utf-8") as csvfile:
-        reader = csv.DictReader(csvfile)
+        reader = csv.reader(csvfile)
+        next(reader, None)  # header: ID,Name,Category,Price
         for row in reader:
-            item_id = int(row["ID"])
-            item = {
-                "Name": row["Name"],
-                "Category": row["Category"],
-                "Price": float(row["Price"]),
-            }
-            items.append((item_id, item))
-    return items
-
+            if not row:
+                continue
+            ids.append(int(row[0]))
+            names.append(row[1])
+            categories.append(row[2])
+            prices.append(float(row[3]))
+    prices = np.array(prices, dtype=np.float64)
+    order = np.argsort(prices, kind="stable")
+    items = np.fromiter(
+        zip(ids, names, categories, prices.tolist()), dtype=object, count=len(ids)
+    )
+    return {
+        "ID": np.array(ids, dtype=np.int64)[order],
+        "Name": np.array(names, dtype=object)[order],
+        "Category": np.array(categories, dtype=object)[order],
+        "Price": prices[order],
+        "Item": items[order],
+    }
 
-def add_item_to_tree(tree: OOBTree, item_id: int, item: Dict):
-    """
-    Adds an item to the given OOBTree.
 
-    Args:
-        tree (OOBTree): The OOBTree to add the item to.
-        item_id (int): The ID of the item to add.
-        item (Dict): The item to add, represented as a dictionary with keys
-            "Name", "Category", and "Price".
+def add_item_to_price_tree(tree: OOBTree, item: Item):
     """
-    tree[item_id] = item
+    Adds an item to the given OOBTree keyed by price.
 
-
-def add_item_to_dict(store: Dict[int, Dict], item_id: int, item: Dict):
-    """
-    Adds an item to the given dictionary-based store.
+    Items with the same price are kept together in a list under that price.
 
     Args:
-        store (Dict[int, Dict]): The dictionary-based store to add the item to.
-        item_id (int): The ID of the item to add.
-        item (Dict): The item to add, represented as a dictionary with keys
-            "Name", "Category", and "Price".
+        tree (OOBTree): The price-keyed OOBTree to add the item to.
+        item (Item): The item to add, as an (ID, Name, Category, Price) tuple.
     """
-
-    store[item_id] = item
+    tree.setdefault(item[3], []).append(item)
 
 
-def range_query_tree(tree: OOBTree, min_price: float, max_price: float) -> List[Dict]:
+def range_query_tree(tree: OOBTree, min_price: float, max_price: float) -> List[Item]:
     """
     Retrieves a list of items from the OOBTree whose prices fall within the specified range.
 
+    Only the keys inside the range are visited, so the query takes
+    O(log n + k) time instead of a full scan.
+
     Args:
-        tree (OOBTree): The OOBTree containing items to query.
+        tree (OOBTree): The price-keyed OOBTree containing items to query.
         min_price (float): The minimum price of the range.
         max_price (float): The maximum price of the range.
 
     Returns:
-        List[Dict]: A list of dictionaries representing the items with prices within the specified range.
+        List[Item]: The (ID, Name, Category, Price) tuples of the items with
+        prices within the specified range, ordered by price.
     """
 
-    return [item for _, item in tree.items() if min_price <= item["Price"] <= max_price]
+    return [item for items in tree.values(min_price, max_price) for item in items]
 
 
 def range_query_dict(
-    store: Dict[int, Dict], min_price: float, max_price: float
-) -> List[Dict]:
+    store: Dict[str, np.ndarray], min_price: float, max_price: float
+) -> List[Item]:
     """
-    Retrieves a list of items from the dictionary-based store whose prices fall within the specified range.
+    Retrieves the items from the dictionary-based column store whose prices fall within the specified range.
+
+    The store is sorted by price, so the range is located with two binary
+    searches in O(log n) time. The matching slice of the prebuilt "Item"
+    column is then copied into a list, so the query costs O(log n + k).
 
     Args:
-        store (Dict[int, Dict]): The dictionary-based store containing items to query.
+        store (Dict[str, np.ndarray]): The column store containing items to query.
         min_price (float): The minimum price of the range.
         max_price (float): The maximum price of the range.
 
     Returns:
-        List[Dict]: A list of dictionaries representing the items with prices within the specified range.
+        List[Item]: The (ID, Name, Category, Price) tuples of the items with
+        prices within the specified range, ordered by price.
     """
 
-    return [item for item in store.values() if min_price <= item["Price"] <= max_price]
+    prices = store["Price"]
+    start = np.searchsorted(prices, min_price, side="left")
+    end = np.searchsorted(prices, max_price, side="right")
+    return store["Item"][start:end].tolist()
 
 
 def main():
-    items = load_items_from_csv(CSV_FILE)
-
-    tree = OOBTree()
-    store = {}
+    store = load_items_from_csv(CSV_FILE)
 
-    for item_id, item in items:
-        add_item_to_tree(tree, item_id, item)
-        add_item_to_dict(store, item_id, item)
+    price_tree = OOBTree()
+    for item in store["Item"].tolist():
+        add_item_to_price_tree(price_tree, item)
 
     price_min = 50.0
     price_max = 150.0
 
     time_tree = timeit(
-        stmt=lambda: range_query_tree(tree, price_min, price_max), number=100
+        stmt=lambda: range_query_tree(price_tree, price_min, price_max), number=100
     )
 
     time_dict = timeit(